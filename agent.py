@@ -8,6 +8,9 @@ or reaches a stop/iteration limit.
 This module integrates:
 - A Google Gemini chat model (via `client.model`).
 - A system prompt (from `prompt.system_prompt`) that configures agent behavior.
+  The agent prepends it to every model call, so callers only send the
+  conversation turns and the prompt prefix stays byte-identical across calls
+  (which keeps Gemini's implicit prompt caching effective).
 - A collection of tools (from `tools.*`) available for agent use.
 
 Usage:
@@ -18,34 +21,67 @@ Usage:
         "messages": [{"role": "user", "content": "What's the weather in Gurugram?"}]
     })
 
+    # Or stream the reply text as it is generated:
+    from agent import stream_agent_response
+    for text in stream_agent_response({"messages": [...]}):
+        print(text, end="", flush=True)
+
 Guidelines:
+- Never interpolate per-turn data (memories, retrieved context) into the
+  system prompt; add it as a separate, later message instead.
 - Each tool should include type hints and a concise docstring, 
   since the agent/model relies on this metadata.
 - Logging is configured via `logger_config` to track agent events.
 """
+from typing import Iterator
+
 from langchain.agents import create_agent
+from langchain.messages import AIMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 from client import model
 from prompt import system_prompt
-from tools import math_calculator, date_utility_tool, get_weather, analyze_text
+from tools import math_calculator, date_utility_tool, get_weather, get_weather_many, analyze_text
 from logger_config import setup_logger
 
 # Initialize logger for this module
 logger = setup_logger(__name__)
 
-logger.info("Initializing LangChain agent")
+# Tools the agent can call, and their names (fixed for the lifetime of the process)
+tools = [math_calculator, date_utility_tool, get_weather, get_weather_many, analyze_text]
+TOOL_NAMES = tuple(tool.name for tool in tools)
 
-# List of tools the agent can call
-tools = [math_calculator, date_utility_tool, get_weather, analyze_text]
+# Tools whose results depend on when they are called; answers built on them must not
+# be reused later (e.g., from the semantic cache)
+TIME_SENSITIVE_TOOLS = frozenset({get_weather.name, get_weather_many.name, date_utility_tool.name})
 
-logger.debug(f"Registered tools: {[tool.name for tool in tools]}")
+logger.debug("Registered tools: %s", TOOL_NAMES)
+
+logger.info("Initializing LangChain agent")
 
 try:
     agent = create_agent(
         model=model,
         tools=tools,
+        system_prompt=system_prompt,
     )
     logger.info("Agent created successfully")
 except Exception as e:
-    logger.error(f"Failed to create agent: {str(e)}", exc_info=True)
+    logger.error("Failed to create agent: %s", e, exc_info=True)
     raise
+
+
+def stream_agent_response(state: dict) -> Iterator[str]:
+    """
+    Runs the agent and yields the model's reply text as soon as each token chunk arrives.
+
+    Args:
+        state (dict): Agent input with a "messages" list.
+
+    Yields:
+        str: Non-empty text chunks from model turns (tool calls and tool results are skipped).
+    """
+    for message, metadata in agent.stream(state, stream_mode="messages"):
+        if metadata.get("langgraph_node") != "model" or not isinstance(message, AIMessage):
+            continue
+        if message.text:
+            yield message.text
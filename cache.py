@@ -0,0 +1,431 @@
+"""
+cache.py
+--------
+Response caching for the Gemini chat model and the agent.
+
+Provides a two-tier exact-match cache that LangChain consults before every
+model call:
+- An in-process LRU for repeated prompts within the same run
+- A SQLite file for reuse across runs, with entries expiring after a TTL
+
+Cache keys are a SHA-256 of the serialized prompt (every message sent to the
+model) together with the LLM configuration string LangChain builds for the call
+(model name, sampling parameters, output limit and bound tool schemas), so any
+change to the conversation or the model setup results in a fresh API call.
+
+It also provides a semantic cache for whole agent answers: user queries are
+embedded with a small local sentence-transformers model and a stored answer is
+reused when a new query is a close paraphrase (cosine similarity above
+`SEMANTIC_SIMILARITY_THRESHOLD`) of one seen before. Queries containing numbers
+bypass the semantic cache entirely: embeddings barely distinguish "(234 * 12) + 98"
+from "(234 * 13) + 98", and skipping them also saves the embedding step.
+Callers should likewise not store answers that go stale (see `main.py`). A lookup
+against an empty (or fully expired) namespace returns before the embedding model
+is loaded.
+sentence-transformers is optional (`requirements-semantic.txt`); without it the
+semantic cache is simply disabled.
+
+Entries are stored as LangChain's JSON serialization (`langchain_core.load`)
+and only LangChain message/output classes are revived on read, so a tampered
+cache file cannot execute code. SQLite problems (unwritable directory, locked
+or read-only file) are logged and degrade the cache instead of failing calls;
+the exact-match cache then keeps working in memory only.
+
+Semantic cache writes are queued and persisted by a background thread in
+batches, so storing an answer never delays the caller; pending writes are
+flushed at interpreter exit.
+
+Usage:
+    from cache import response_cache
+    model = ChatGoogleGenerativeAI(..., cache=response_cache)
+
+    from cache import semantic_lookup, semantic_store
+    answer = semantic_lookup(user_text)
+    if answer is None:
+        answer = ...  # invoke the agent
+        semantic_store(user_text, answer)
+"""
+
+import atexit
+import hashlib
+import json
+import queue
+import re
+import sqlite3
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from importlib.util import find_spec
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.load import dumps, loads
+from logger_config import setup_logger
+
+# orjson serializes cache-key payloads several times faster; fall back to stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# `loads` is flagged as beta; cache reads would otherwise print the notice once per process
+warnings.filterwarnings("ignore", message="The function `loads` is in beta", category=LangChainBetaWarning)
+
+# Initialize logger for this module
+logger = setup_logger(__name__)
+
+CACHE_DB_PATH = "llm_cache.sqlite"
+CACHE_TTL_SECONDS = 3600
+MEMORY_CACHE_SIZE = 512
+
+# Responses sampled above this temperature are not reproducible enough to reuse
+MAX_CACHEABLE_TEMPERATURE = 0.2
+
+# Semantic cache settings
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+SEMANTIC_SIMILARITY_THRESHOLD = 0.92
+
+# Background writer flushes after this many queued answers or this many seconds
+SEMANTIC_WRITE_BATCH_SIZE = 16
+SEMANTIC_WRITE_INTERVAL_SECONDS = 2.0
+
+# Any digit makes the exact value significant, which similarity search cannot respect
+_NUMERIC_QUERY_RE = re.compile(r"\d")
+
+
+def make_cache_key(payload: Any) -> str:
+    """
+    Builds a stable SHA-256 hex digest for a JSON-serializable payload.
+
+    Args:
+        payload (Any): Data identifying a request (dict keys are sorted first).
+
+    Returns:
+        str: 64-character hexadecimal cache key.
+    """
+    if orjson is not None:
+        serialized = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+    else:
+        serialized = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(serialized).hexdigest()
+
+
+def _open_db(db_path: str, *statements: str) -> Optional[sqlite3.Connection]:
+    """
+    Opens a SQLite cache file and creates its schema.
+
+    Args:
+        db_path (str): SQLite file to open (created if missing).
+        *statements (str): Schema statements to run on the new connection.
+
+    Returns:
+        sqlite3.Connection | None: Shared connection, or None if the file cannot be used.
+    """
+    try:
+        # Agent tool calls may run on worker threads, so share one guarded connection
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        for statement in statements:
+            conn.execute(statement)
+        conn.commit()
+        return conn
+    except sqlite3.Error as e:
+        logger.warning("Cache database %s unavailable, persistence disabled: %s", db_path, e)
+        return None
+
+
+class ResponseCache(BaseCache):
+    """
+    Exact-match LangChain cache backed by an in-memory LRU and a SQLite file.
+
+    Args:
+        db_path (str): SQLite file used for cross-run persistence.
+        ttl_seconds (int): Age after which a persisted response is ignored.
+        maxsize (int): Maximum number of responses held in memory.
+    """
+
+    def __init__(
+        self,
+        db_path: str = CACHE_DB_PATH,
+        ttl_seconds: int = CACHE_TTL_SECONDS,
+        maxsize: int = MEMORY_CACHE_SIZE,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._memory: "OrderedDict[str, RETURN_VAL_TYPE]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._conn = _open_db(
+            db_path, "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, response TEXT, ts INT)"
+        )
+        logger.debug("Response cache opened at %s (ttl=%ss, maxsize=%s)", db_path, ttl_seconds, maxsize)
+
+    def _remember(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        """Stores a value in the memory tier, evicting the least recently used entry."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Returns cached generations for the prompt/config pair, or None on a miss."""
+        key = make_cache_key({"prompt": prompt, "llm": llm_string})
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                logger.debug("[CACHE HIT] memory key=%.12s", key)
+                return self._memory[key]
+
+            if self._conn is None:
+                logger.debug("[CACHE MISS] key=%.12s", key)
+                return None
+
+            try:
+                row = self._conn.execute(
+                    "SELECT response FROM cache WHERE key = ? AND ts > ?",
+                    (key, int(time.time()) - self.ttl_seconds),
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Response cache read failed: %s", e)
+                return None
+            if row is None:
+                logger.debug("[CACHE MISS] key=%.12s", key)
+                return None
+
+            try:
+                value = loads(row[0], allowed_objects="core")
+            except Exception as e:
+                logger.warning("Discarding unreadable cache entry %.12s: %s", key, e)
+                return None
+
+            self._remember(key, value)
+            logger.debug("[CACHE HIT] disk key=%.12s", key)
+            return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Stores the generations for the prompt/config pair in both tiers."""
+        key = make_cache_key({"prompt": prompt, "llm": llm_string})
+
+        with self._lock:
+            self._remember(key, return_val)
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO cache (key, response, ts) VALUES (?, ?, ?)",
+                        (key, dumps(list(return_val)), int(time.time())),
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning("Response cache write failed: %s", e)
+        logger.debug("[CACHE STORE] key=%.12s", key)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Removes every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM cache")
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning("Response cache clear failed: %s", e)
+        logger.info("Response cache cleared")
+
+
+# Shared cache instance used by the chat model
+response_cache = ResponseCache()
+
+
+# ==================== Semantic Cache ====================
+# Checked without importing, so torch is only loaded once an embedding is needed
+SEMANTIC_CACHE_ENABLED = find_spec("sentence_transformers") is not None
+
+# Separate locks, so a slow model load never blocks database access or the
+# enqueue in semantic_store (which may run on an event loop thread)
+_embedder = None
+_embedder_lock = threading.Lock()    # guards the one-time model load
+_db_lock = threading.Lock()          # guards _semantic_conn
+_writer_lock = threading.Lock()      # guards the one-time writer thread start
+_semantic_conn = _open_db(
+    CACHE_DB_PATH,
+    "CREATE TABLE IF NOT EXISTS semantic_cache ("
+    "id INTEGER PRIMARY KEY, namespace TEXT, prompt TEXT, embedding BLOB, response TEXT, ts INT)",
+    "CREATE INDEX IF NOT EXISTS idx_semantic_namespace ON semantic_cache (namespace, ts)",
+) if SEMANTIC_CACHE_ENABLED else None
+
+if not SEMANTIC_CACHE_ENABLED:
+    logger.debug("sentence-transformers not installed; semantic cache disabled")
+
+
+_write_queue: "queue.Queue" = queue.Queue()
+_writer_thread = None
+
+
+def _embed(texts):
+    """
+    Embeds text with the local sentence-transformers model, loading it on first use.
+
+    Args:
+        texts (str | list[str]): Text, or a batch of texts, to embed.
+
+    Returns:
+        numpy.ndarray: L2-normalized float32 vector (one row per text for a batch).
+    """
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                # Imported lazily so the model is only loaded when the semantic cache is used
+                from sentence_transformers import SentenceTransformer
+
+                logger.info("Loading embedding model: %s", EMBEDDING_MODEL_NAME)
+                _embedder = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    return _embedder.encode(texts, normalize_embeddings=True).astype("float32")
+
+
+def _is_semantically_cacheable(text: str) -> bool:
+    """
+    Checks whether a query may be answered from (or stored in) the semantic cache.
+
+    Args:
+        text (str): User query.
+
+    Returns:
+        bool: False for queries containing numbers, True otherwise.
+    """
+    if _NUMERIC_QUERY_RE.search(text):
+        logger.debug("[SEMANTIC SKIP] numeric query bypasses the semantic cache")
+        return False
+    return True
+
+
+def semantic_lookup(text: str, namespace: str = "default") -> Optional[Any]:
+    """
+    Returns a stored answer for the closest previously seen query, if similar enough.
+
+    Args:
+        text (str): User query.
+        namespace (str): Partition of the cache to search (e.g., per user).
+
+    Returns:
+        Any: The stored answer (typically an `AIMessage`), or None on a miss.
+    """
+    if _semantic_conn is None or not _is_semantically_cacheable(text):
+        return None
+
+    try:
+        import numpy as np
+
+        with _db_lock:
+            rows = _semantic_conn.execute(
+                "SELECT embedding, response FROM semantic_cache WHERE namespace = ? AND ts > ?",
+                (namespace, int(time.time()) - CACHE_TTL_SECONDS),
+            ).fetchall()
+        # Checked before embedding, so the model is never loaded just to search nothing
+        if not rows:
+            logger.debug("[SEMANTIC MISS] namespace=%s is empty", namespace)
+            return None
+
+        query = _embed(text)
+        # Embeddings are normalized, so the dot product is the cosine similarity
+        matrix = np.stack([np.frombuffer(row[0], dtype=np.float32) for row in rows])
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if scores[best] < SEMANTIC_SIMILARITY_THRESHOLD:
+            logger.debug("[SEMANTIC MISS] best similarity=%.3f", scores[best])
+            return None
+
+        logger.info("[SEMANTIC HIT] similarity=%.3f", scores[best])
+        return loads(rows[best][1], allowed_objects="messages")
+
+    except Exception as e:
+        logger.warning("Semantic cache lookup failed: %s", e)
+        return None
+
+
+def _write_batch(batch: list) -> None:
+    """
+    Embeds and persists a batch of queued answers in a single transaction.
+
+    Args:
+        batch (list): Queued (namespace, text, response, timestamp) tuples.
+    """
+    try:
+        embeddings = _embed([text for _, text, _, _ in batch])
+        rows = [
+            (namespace, text, embedding.tobytes(), dumps(response), ts)
+            for (namespace, text, response, ts), embedding in zip(batch, embeddings)
+        ]
+        with _db_lock:
+            _semantic_conn.executemany(
+                "INSERT INTO semantic_cache (namespace, prompt, embedding, response, ts) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            _semantic_conn.commit()
+        logger.debug("[SEMANTIC STORE] wrote %d entries", len(rows))
+
+    except Exception as e:
+        logger.warning("Semantic cache store failed: %s", e)
+
+
+def _flush_loop() -> None:
+    """Collects queued answers into batches and writes them until a stop sentinel arrives."""
+    stopping = False
+    while not stopping:
+        item = _write_queue.get()
+        if item is None:
+            break
+
+        batch = [item]
+        deadline = time.monotonic() + SEMANTIC_WRITE_INTERVAL_SECONDS
+        while len(batch) < SEMANTIC_WRITE_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = _write_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+
+        _write_batch(batch)
+
+
+def _drain() -> None:
+    """Stops the writer thread after it has flushed every queued answer."""
+    if _writer_thread is not None:
+        _write_queue.put(None)
+        _writer_thread.join(timeout=30)
+
+
+def semantic_store(text: str, response: Any, namespace: str = "default") -> None:
+    """
+    Queues an answer so that later paraphrases of the query can reuse it.
+
+    The answer is embedded and written by a background thread; this call returns immediately.
+
+    Args:
+        text (str): User query that produced the answer.
+        response (Any): Answer to store (typically the agent's final `AIMessage`).
+        namespace (str): Partition of the cache to write to (e.g., per user).
+    """
+    global _writer_thread
+
+    if _semantic_conn is None or not _is_semantically_cacheable(text):
+        return
+
+    if _writer_thread is None:
+        with _writer_lock:
+            if _writer_thread is None:
+                _writer_thread = threading.Thread(target=_flush_loop, name="semantic-cache-writer", daemon=True)
+                _writer_thread.start()
+                atexit.register(_drain)
+
+    _write_queue.put((namespace, text, response, int(time.time())))
+    logger.debug("[SEMANTIC QUEUE] namespace=%s, prompt length=%d", namespace, len(text))
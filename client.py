@@ -8,38 +8,92 @@ and exports it as `model` for use across the application.
 Configuration:
 - `temperature`, `top_p`, and `top_k` govern response randomness and creativity.
 - `max_output_tokens` limits the number of tokens in each model output.
+- Low-temperature responses are served from `cache.response_cache` when the
+  exact same messages, tools, and settings were sent before.
 
 Security:
 - Keep the API key outside of source control, e.g., via environment variables 
   or a separate secrets/credentials file not committed to the repository.
 
 Usage:
-    from client import model
+    from client import model          # or: from client import get_model
     response = model.predict("Hello, world!")
+
+    # Optionally open the API connection in the background while the process is
+    # otherwise idle (e.g., waiting for user input) before the first query
+    from client import warm_up
+    warm_up()
 """
+import threading
+from functools import lru_cache
+
+from langchain.messages import HumanMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
+from cache import response_cache, MAX_CACHEABLE_TEMPERATURE
 from cred import gemini_api_key
 from logger_config import setup_logger
 
 # Initialize logger for this module
 logger = setup_logger(__name__)
 
-logger.info("Initializing Gemini chat model client")
-
-try:
-    model = ChatGoogleGenerativeAI(
-        model="gemini-3-flash-preview",
-        api_key=gemini_api_key,
-        temperature=0.2,          # Low randomness for stable responses
-        top_p=0.9,                 # Probability mass for nucleus sampling
-        top_k=40,                  # Limits tokens considered at each step
-        max_output_tokens=600,     # Cap on output length
-    )
-    logger.info("Gemini model initialized successfully")
-    logger.debug(
-        "Model config: model=gemini-2.5-flash-lite, "
-        "temperature=0.2, top_p=0.9, top_k=40, max_output_tokens=512"
-    )
-except Exception as e:
-    logger.error(f"Failed to initialize Gemini model: {str(e)}", exc_info=True)
-    raise
+MODEL_NAME = "gemini-3-flash-preview"
+temperature = 0.2  # Low randomness for stable responses
+
+
+@lru_cache(maxsize=1)
+def get_model() -> ChatGoogleGenerativeAI:
+    """
+    Creates the Gemini chat model on first call and returns the same instance afterwards,
+    so every importer shares one client and one HTTP connection pool.
+
+    Returns:
+        ChatGoogleGenerativeAI: Configured chat model.
+    """
+    logger.info("Initializing Gemini chat model client")
+
+    try:
+        chat_model = ChatGoogleGenerativeAI(
+            model=MODEL_NAME,
+            api_key=gemini_api_key,
+            temperature=temperature,
+            top_p=0.9,                 # Probability mass for nucleus sampling
+            top_k=40,                  # Limits tokens considered at each step
+            max_output_tokens=600,     # Cap on output length
+            # Only near-deterministic sampling is safe to replay from the cache
+            cache=response_cache if temperature <= MAX_CACHEABLE_TEMPERATURE else None,
+        )
+        logger.info("Gemini model initialized successfully")
+        logger.debug(
+            "Model config: model=%s, temperature=%s, top_p=%s, top_k=%s, max_output_tokens=%s",
+            chat_model.model, chat_model.temperature, chat_model.top_p,
+            chat_model.top_k, chat_model.max_output_tokens,
+        )
+        return chat_model
+    except Exception as e:
+        logger.error("Failed to initialize Gemini model: %s", e, exc_info=True)
+        raise
+
+
+model = get_model()
+
+
+def _send_warmup_request() -> None:
+    """Sends a one-token request so the HTTPS connection to the Gemini API is open and pooled."""
+    try:
+        # The copy shares the original client (and its connection pool) but skips the response cache
+        model.model_copy(update={"max_output_tokens": 1, "cache": False}).invoke([HumanMessage(".")])
+        logger.debug("Gemini connection warm-up completed")
+    except Exception as e:
+        logger.debug("Gemini connection warm-up failed: %s", e)
+
+
+def warm_up() -> None:
+    """
+    Starts a background request that performs DNS, TCP, and TLS setup for the Gemini API,
+    hiding that handshake latency from the first real (synchronous) model call.
+
+    Only worth calling when the warm-up can finish before that call (e.g., while waiting
+    for user input). Started right before a real request, it just races it on a second
+    connection and costs an extra billed call.
+    """
+    threading.Thread(target=_send_warmup_request, name="gemini-warmup", daemon=True).start()
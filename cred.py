@@ -25,11 +25,11 @@ logger.debug(".env file loaded successfully")
 
 # Load Gemini API key
 gemini_api_key = os.getenv("GEMINI_API_KEY", "")
-logger.debug(f"GEMINI_API_KEY present: {bool(gemini_api_key)}")
+logger.debug("GEMINI_API_KEY present: %s", bool(gemini_api_key))
 
 # Load Weather API key
 weather_api_key = os.getenv("WEATHER_API_KEY", "")
-logger.debug(f"WEATHER_API_KEY present: {bool(weather_api_key)}")
+logger.debug("WEATHER_API_KEY present: %s", bool(weather_api_key))
 
 # Validate that required API keys are present
 if not gemini_api_key:
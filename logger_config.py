@@ -6,19 +6,121 @@ Provides consistent log formatting, levels, and handlers across all modules.
 
 Features:
 - Rotating file logs (5MB per file, 5 backups)
-- Console logs with concise output
+- Console logs with concise output (stdout by default; see `set_console_stream`)
 - Customizable logger name and log level
+- Formatters and handlers shared across all loggers (one open file per log)
+- Non-blocking log calls: records are queued and written by a background
+  listener thread, so disk and console I/O stay off the request path
+- Use lazy `%s` arguments in log calls so disabled levels cost no formatting
 """
 
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
 
 
+# Formatter for detailed file logs
+_detailed_formatter = logging.Formatter(
+    fmt='%(asctime)s | %(levelname)-8s | %(name)s:%(funcName)s:%(lineno)d | %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# Formatter for concise console logs
+_console_formatter = logging.Formatter(
+    fmt='%(levelname)-8s | %(name)s | %(message)s'
+)
+
+# Handlers are shared by every logger so each log file is opened (and rotated) once
+_file_handlers: dict = {}
+_console_handler = None
+
+# One queue (and listener thread) per log file; loggers only ever enqueue records
+_queue_handlers: dict = {}
+
+
+def _get_file_handler(log_file: str) -> RotatingFileHandler:
+    """
+    Returns the shared rotating file handler for a log file, creating it on first use.
+
+    Args:
+        log_file (str): Path to the log file
+
+    Returns:
+        RotatingFileHandler: Handler writing detailed records to `log_file`
+    """
+    if log_file not in _file_handlers:
+        # File handler with rotation (max 5MB per file, keep 5 backups)
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=5*1024*1024,  # 5 MB
+            backupCount=5,
+            encoding='utf-8'
+        )
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(_detailed_formatter)
+        _file_handlers[log_file] = file_handler
+    return _file_handlers[log_file]
+
+
+def _get_console_handler() -> logging.StreamHandler:
+    """
+    Returns the shared stdout handler, creating it on first use.
+
+    Returns:
+        logging.StreamHandler: Handler writing concise records to stdout
+    """
+    global _console_handler
+    if _console_handler is None:
+        # Console handler (INFO level by default)
+        _console_handler = logging.StreamHandler(sys.stdout)
+        _console_handler.setLevel(logging.INFO)
+        _console_handler.setFormatter(_console_formatter)
+    return _console_handler
+
+
+def set_console_stream(stream) -> None:
+    """
+    Redirects console log output, e.g. to stderr while stdout carries program output.
+
+    Args:
+        stream: Writable text stream such as `sys.stderr`
+    """
+    _get_console_handler().setStream(stream)
+
+
+def _get_queue_handler(log_file: str) -> QueueHandler:
+    """
+    Returns the queue handler feeding a log file, starting its listener on first use.
+
+    The listener thread owns the real file and console handlers and is stopped
+    at interpreter exit, which flushes any records still in the queue.
+
+    Args:
+        log_file (str): Path to the log file
+
+    Returns:
+        QueueHandler: Handler that enqueues records without doing any I/O
+    """
+    if log_file not in _queue_handlers:
+        log_queue = queue.Queue(-1)
+        listener = QueueListener(
+            log_queue,
+            _get_file_handler(log_file),
+            _get_console_handler(),
+            respect_handler_level=True,
+        )
+        listener.start()
+        atexit.register(listener.stop)
+        _queue_handlers[log_file] = QueueHandler(log_queue)
+    return _queue_handlers[log_file]
+
+
 def setup_logger(name: str, log_file: str = "agent_app.log", level=logging.DEBUG) -> logging.Logger:
     """
-    Creates and configures a logger with both file and console handlers.
+    Creates and configures a logger that writes to both the log file and the console.
 
     Args:
         name (str): Logger name (typically __name__ of the calling module)
@@ -36,35 +138,8 @@ def setup_logger(name: str, log_file: str = "agent_app.log", level=logging.DEBUG
     if logger.handlers:
         return logger
     
-    # Formatter for detailed file logs
-    detailed_formatter = logging.Formatter(
-        fmt='%(asctime)s | %(levelname)-8s | %(name)s:%(funcName)s:%(lineno)d | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Formatter for concise console logs
-    console_formatter = logging.Formatter(
-        fmt='%(levelname)-8s | %(name)s | %(message)s'
-    )
-    
-    # File handler with rotation (max 5MB per file, keep 5 backups)
-    file_handler = RotatingFileHandler(
-        log_file,
-        maxBytes=5*1024*1024,  # 5 MB
-        backupCount=5,
-        encoding='utf-8'
-    )
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(detailed_formatter)
-    
-    # Console handler (INFO level by default)
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(console_formatter)
-    
-    # Attach handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Attach the shared queue handler; the listener thread performs the writes
+    logger.addHandler(_get_queue_handler(log_file))
     
     return logger
 
@@ -73,5 +148,5 @@ def setup_logger(name: str, log_file: str = "agent_app.log", level=logging.DEBUG
 app_logger = setup_logger('agent_app')
 app_logger.info("="*50)
 app_logger.info("Logging system initialized")
-app_logger.info(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+app_logger.info("Timestamp: %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
 app_logger.info("="*50)
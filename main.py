@@ -5,127 +5,172 @@ Demonstrates agent invocation examples with comprehensive logging.
 This script runs multiple scenarios including math calculations,
 multi-tool usage, and API queries, while logging all important steps
 for debugging and traceability.
+
+The examples are independent, so they are sent to the agent concurrently
+with `agent.ainvoke`; total runtime is that of the slowest example rather
+than the sum of all three.
+
+Passing a query on the command line (`python main.py "..."`) answers just
+that query instead, streaming the reply to the terminal as it is generated.
+
+Example answers go through the semantic cache, which can only serve queries
+that contain no numbers and whose answers used no time-sensitive tools
+(weather, relative dates): numeric queries are never looked up or stored, and
+time-sensitive answers are never stored. None of the bundled examples
+qualifies (1 and 2 contain numbers, 3 fetches weather), so for them the cache
+is a cheap no-op: with nothing stored, a lookup returns without loading the
+embedding model. It pays off for other queries, e.g., repeated text-analysis
+questions. The streaming path bypasses the semantic cache: each CLI query is a
+fresh process, and loading the embedding model would delay the first token by
+seconds.
 """
 
-import traceback
-from agent import agent
-from logger_config import setup_logger
-from prompt import system_prompt, user_query_1, user_query_2, user_query_3
+import asyncio
+import sys
+from agent import TIME_SENSITIVE_TOOLS, agent, stream_agent_response
+from cache import semantic_lookup, semantic_store
+from langchain.messages import AIMessage, HumanMessage
+from logger_config import set_console_stream, setup_logger
+from prompt import user_query_1, user_query_2, user_query_3
 
 # Initialize logger for the main module
 logger = setup_logger(__name__)
 
-# ==================== Define message structures for each example ====================
-
-# Example 1: Simple math calculation query
-message1 = {
-    "messages": [
-        system_prompt,
-        user_query_1
-    ]
-}
-
-# Example 2: Multi-tool usage (math + date operations)
-message2 = {
-    "messages": [
-        system_prompt,
-        user_query_2
-    ]
-}
-
-# Example 3: Weather API query with recommendations
-message3 = {
-    "messages": [
-        system_prompt,
-        user_query_3
-    ]
-}
-
-if __name__ == "__main__":
-    logger.info("="*70)
-    logger.info("APPLICATION STARTED")
-    logger.info("="*70)
-
-    # ==================== Example 1: Math Calculation ====================
-    try:
-        logger.info("\n[EXAMPLE 1] Starting math calculation example")
-        logger.info(f"[EXAMPLE 1] User query: {user_query_1}")
 
-        math_response = agent.invoke(message1)
-
-        logger.info(f"[EXAMPLE 1] Agent invocation completed successfully")
-        logger.debug(f"[EXAMPLE 1] Response messages count: {len(math_response['messages'])}")
-        logger.debug(f"[EXAMPLE 1] Final message type: {type(math_response['messages'][-1])}")
-
-        print("\n--- Example 1 ---")
-        print(math_response["messages"][-1].content)
-
-        logger.info(f"[EXAMPLE 1] Output displayed to user")
-
-    except KeyError as e:
-        logger.error(f"[EXAMPLE 1] KeyError - missing expected key in response: {e}", exc_info=True)
-        print("\n--- Example 1 FAILED ---")
-        print(f"Error: Missing expected data in response - {e}")
-
-    except Exception as e:
-        logger.error(f"[EXAMPLE 1] Unexpected error occurred: {e}", exc_info=True)
-        logger.debug(f"[EXAMPLE 1] Full traceback:\n{traceback.format_exc()}")
-        print("\n--- Example 1 FAILED ---")
-        print(f"Error: {e}")
+def _uses_time_sensitive_tools(messages: list) -> bool:
+    """
+    Checks whether the agent called any tool whose result goes stale over time.
+
+    Args:
+        messages (list): Messages of a completed agent run.
+
+    Returns:
+        bool: True if any AI turn requested a tool in `TIME_SENSITIVE_TOOLS`.
+    """
+    return any(
+        call["name"] in TIME_SENSITIVE_TOOLS
+        for message in messages
+        if isinstance(message, AIMessage)
+        for call in message.tool_calls
+    )
+
+
+async def answer_query(query: HumanMessage):
+    """
+    Answers a query from the semantic cache, falling back to the agent on a miss.
+
+    Args:
+        query (HumanMessage): User query to answer.
+
+    Returns:
+        AIMessage: Final agent message containing the answer.
+    """
+    user_text = query.content
+
+    # Embedding runs on a worker thread so concurrent queries are not blocked
+    cached = await asyncio.to_thread(semantic_lookup, user_text)
+    if cached is not None:
+        logger.info("Answer served from semantic cache")
+        return cached
+
+    # Each call builds its own input state; only the (never modified) query is shared
+    response = await agent.ainvoke({"messages": [query]})
+    logger.debug("Response messages count: %d", len(response["messages"]))
+
+    answer = response["messages"][-1]
+    if _uses_time_sensitive_tools(response["messages"]):
+        logger.debug("Answer depends on time-sensitive tools; not stored in semantic cache")
+    else:
+        semantic_store(user_text, answer)
+    return answer
+
+
+# ==================== Define the example queries ====================
+
+# (log tag, display title, user query) for each example:
+# - Example 1: Simple math calculation query
+# - Example 2: Multi-tool usage (math + date operations)
+# - Example 3: Weather API query with recommendations
+# Only the queries are stored; the agent input state is built per call by answer_query
+examples = (
+    ("EXAMPLE 1", "Example 1", user_query_1),
+    ("EXAMPLE 2", "Multi Tool Example", user_query_2),
+    ("EXAMPLE 3", "Real API Tool Example", user_query_3),
+)
+
+
+async def run_example_queries() -> None:
+    """
+    Runs all examples concurrently and prints each result in order.
+
+    A failing example is logged and reported without affecting the others.
+    """
+    for tag, _, query in examples:
+        logger.info("[%s] User query: %s", tag, query.content)
+
+    results = await asyncio.gather(
+        *(answer_query(query) for _, _, query in examples),
+        return_exceptions=True,
+    )
+
+    for (tag, title, _), result in zip(examples, results):
+        if isinstance(result, KeyError):
+            logger.error("[%s] KeyError - missing expected key in response: %s", tag, result, exc_info=result)
+            print(f"\n--- {title} FAILED ---")
+            print(f"Error: Missing expected data in response - {result}")
+
+        elif isinstance(result, BaseException):
+            # exc_info already records the full traceback; it is formatted once, by the handler
+            logger.error("[%s] Unexpected error occurred: %s", tag, result, exc_info=result)
+            print(f"\n--- {title} FAILED ---")
+            print(f"Error: {result}")
+
+        else:
+            logger.info("[%s] Agent invocation completed successfully", tag)
+            print(f"\n--- {title} ---")
+            print(result.content)
+            logger.info("[%s] Output displayed to user", tag)
+
+
+def stream_query(user_text: str) -> None:
+    """
+    Answers a single query, printing the reply incrementally as the model generates it.
+
+    Args:
+        user_text (str): Query to send to the agent.
+    """
+    logger.info("[QUERY] User query: %s", user_text)
 
-    # ==================== Example 2: Multi-Tool Usage ====================
     try:
-        logger.info("\n[EXAMPLE 2] Starting multi-tool example")
-        user_query_2 = "Calculate the total cost if I buy 3 items priced at 499 each and tell me the delivery date if shipping takes 7 days."
-        logger.info(f"[EXAMPLE 2] User query: {user_query_2}")
-
-        multi_response = agent.invoke(message2)
-
-        logger.info(f"[EXAMPLE 2] Agent invocation completed successfully")
-        logger.debug(f"[EXAMPLE 2] Response messages count: {len(multi_response['messages'])}")
-
-        print("\n--- Multi Tool Example ---")
-        print(multi_response["messages"][-1].content)
-
-        logger.info(f"[EXAMPLE 2] Output displayed to user")
-
-    except KeyError as e:
-        logger.error(f"[EXAMPLE 2] KeyError - missing expected key in response: {e}", exc_info=True)
-        print("\n--- Multi Tool Example FAILED ---")
-        print(f"Error: Missing expected data in response - {e}")
+        for text in stream_agent_response({"messages": [HumanMessage(user_text)]}):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        print()
 
     except Exception as e:
-        logger.error(f"[EXAMPLE 2] Unexpected error occurred: {e}", exc_info=True)
-        logger.debug(f"[EXAMPLE 2] Full traceback:\n{traceback.format_exc()}")
-        print("\n--- Multi Tool Example FAILED ---")
+        logger.exception("[QUERY] Unexpected error occurred: %s", e)
+        print("\n--- Query FAILED ---")
         print(f"Error: {e}")
+        return
 
-    ==================== Example 3: Weather API ====================
-    try:
-        logger.info("\n[EXAMPLE 3] Starting weather API example")
-        logger.info(f"[EXAMPLE 3] User query: {user_query_3}")
-
-        api_response = agent.invoke(message3)
-
-        logger.info(f"[EXAMPLE 3] Agent invocation completed successfully")
-        logger.debug(f"[EXAMPLE 3] Response messages count: {len(api_response['messages'])}")
+    logger.info("[QUERY] Output streamed to user")
 
-        print("\n--- Real API Tool Example ---")
-        print(api_response["messages"][-1].content)
 
-        logger.info(f"[EXAMPLE 3] Output displayed to user")
-
-    except KeyError as e:
-        logger.error(f"[EXAMPLE 3] KeyError - missing expected key in response: {e}", exc_info=True)
-        print("\n--- Real API Tool Example FAILED ---")
-        print(f"Error: Missing expected data in response - {e}")
+if __name__ == "__main__":
+    logger.info("="*70)
+    logger.info("APPLICATION STARTED")
+    logger.info("="*70)
 
-    except Exception as e:
-        logger.error(f"[EXAMPLE 3] Unexpected error occurred: {e}", exc_info=True)
-        logger.debug(f"[EXAMPLE 3] Full traceback:\n{traceback.format_exc()}")
-        print("\n--- Real API Tool Example FAILED ---")
-        print(f"Error: {e}")
+    if len(sys.argv) > 1:
+        # The reply is streamed to stdout; keep the console logs written by the
+        # listener thread from interleaving with it
+        set_console_stream(sys.stderr)
+        stream_query(" ".join(sys.argv[1:]))
+        completed = "QUERY COMPLETED"
+    else:
+        asyncio.run(run_example_queries())
+        completed = "ALL EXAMPLES COMPLETED"
 
     logger.info("="*70)
-    logger.info("ALL EXAMPLES COMPLETED")
+    logger.info(completed)
     logger.info("="*70)
@@ -15,6 +15,8 @@ Purpose:
     easier to audit tool usage without touching the main application code.
 
 Design Principles:
+    - System prompt is a constant: the agent sends it verbatim on every call, so it must
+      never be formatted with per-request data (keeps the provider-side cached prefix stable)
     - System prompt clarifies when to call tools and how to combine their outputs
     - Tool outputs are authoritative and must not be overridden
     - Responses are human-readable and include relevant context and units
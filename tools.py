@@ -1,56 +1,225 @@
 import ast
-import operator as op
+import logging
+import re
+import threading
+import time
+import unicodedata
 import requests
-from datetime import date, timedelta
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache
+from types import CodeType
+from typing import List, Union
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from langchain_core.tools import tool
 from cred import weather_api_key
 from logger_config import setup_logger
 
+# orjson parses API responses several times faster; fall back to requests' stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Initialize logger for this module
 logger = setup_logger(__name__)
 
 # ==================== Math Tool (Safe Evaluation) ====================
-OPERATORS = {
-    ast.Add: op.add,
-    ast.Sub: op.sub,
-    ast.Mult: op.mul,
-    ast.Div: op.truediv,
-    ast.Pow: op.pow,
-}
+# Binary and unary operators permitted in math_calculator expressions
+ALLOWED_OPERATORS = frozenset({
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.Pow,
+})
+ALLOWED_UNARY_OPERATORS = frozenset({ast.USub, ast.UAdd})
+
+# Inputs beyond these bounds are rejected before parsing, keeping the parser's memory
+# use and C-stack depth bounded for pathological expressions
+MAX_EXPRESSION_LENGTH = 512
+MAX_PAREN_DEPTH = 32
+
+# Short expressions like 9**9**9 can still take unbounded time and memory, so integer
+# powers whose result would exceed this size are refused before evaluation, as are
+# oversized integer results (which also keeps them out of the result cache)
+MAX_RESULT_BITS = 10_000
+
+
+def _check_expression_size(expression: str) -> None:
+    """
+    Rejects expressions too long or too deeply parenthesized to be worth parsing.
+
+    Args:
+        expression (str): Arithmetic expression like "(234 * 12) + 98".
+
+    Raises:
+        ValueError: If the expression exceeds `MAX_EXPRESSION_LENGTH` characters or
+            nests parentheses deeper than `MAX_PAREN_DEPTH`.
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Expression too long (max {MAX_EXPRESSION_LENGTH} characters)")
+
+    depth = 0
+    for ch in expression:
+        if ch == "(":
+            depth += 1
+            if depth > MAX_PAREN_DEPTH:
+                raise ValueError(f"Expression nested too deeply (max depth {MAX_PAREN_DEPTH})")
+        elif ch == ")":
+            depth -= 1
 
 
-def _eval_expr(node: ast.AST) -> float:
+def _validate_expr(root: ast.AST) -> list:
     """
-    Recursively evaluates a restricted Python AST node representing an arithmetic expression.
+    Checks that an AST contains only numbers and whitelisted operators.
+
+    Walks the tree iteratively with an explicit stack, so deeply nested expressions
+    cost no Python recursion and cannot hit the interpreter's recursion limit.
 
     Args:
-        node (ast.AST): AST node produced by parsing an expression.
+        root (ast.AST): Root node produced by parsing an expression.
 
     Returns:
-        float: Computed numeric result.
+        list: The `**` nodes of the tree, each listed before any power nested inside it.
 
     Raises:
-        ValueError: If an unsupported AST node is encountered.
+        ValueError: If an unsupported AST node or operator is encountered.
     """
-    logger.debug(f"Evaluating AST node: {type(node).__name__}")
-    
-    if isinstance(node, ast.Constant):
-        return node.n
-    if isinstance(node, ast.BinOp):
-        return OPERATORS[type(node.op)](
-            _eval_expr(node.left),
-            _eval_expr(node.right)
-        )
-    
-    logger.error(f"Invalid expression node type: {type(node).__name__}")
-    raise ValueError("Invalid expression")
+    constant, binop, unaryop, power = ast.Constant, ast.BinOp, ast.UnaryOp, ast.Pow
+    powers = []
+    stack = [root]
+    pop, push = stack.pop, stack.append
+
+    while stack:
+        node = pop()
+        node_type = type(node)
+
+        if node_type is constant and type(node.value) in (int, float):
+            continue
+        if node_type is binop and type(node.op) in ALLOWED_OPERATORS:
+            if type(node.op) is power:
+                powers.append(node)
+            push(node.right)
+            push(node.left)
+            continue
+        if node_type is unaryop and type(node.op) in ALLOWED_UNARY_OPERATORS:
+            push(node.operand)
+            continue
+
+        if node_type in (binop, unaryop):
+            logger.error("Unsupported operator: %s", type(node.op).__name__)
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        logger.error("Invalid expression node type: %s", node_type.__name__)
+        raise ValueError("Invalid expression")
+
+    return powers
+
+
+def _evaluate_node(node: ast.AST) -> Union[int, float]:
+    """
+    Evaluates a validated expression subtree.
+
+    Args:
+        node (ast.AST): Subtree of a tree accepted by `_validate_expr`.
+
+    Returns:
+        int | float: Value of the subtree.
+    """
+    code = compile(ast.Expression(body=node), "<calc>", "eval")
+    return eval(code, {"__builtins__": {}}, {})
+
+
+def _describe_int(value: int) -> str:
+    """Formats an integer for error messages, summarizing very long ones by size."""
+    if value.bit_length() <= 64:
+        return str(value)
+    return f"<{value.bit_length()}-bit integer>"
+
+
+def _check_power_sizes(powers: list) -> None:
+    """
+    Rejects integer powers whose result would exceed `MAX_RESULT_BITS`.
+
+    Powers are checked innermost first, so each operand evaluated here only contains
+    powers already known to be small; the length limit bounds everything else.
+    Float powers need no check: they overflow quickly with an OverflowError.
+
+    Args:
+        powers (list): `**` nodes as returned by `_validate_expr`.
+
+    Raises:
+        ValueError: If an integer power would be too large to compute.
+    """
+    for node in reversed(powers):
+        base, exponent = _evaluate_node(node.left), _evaluate_node(node.right)
+        if type(base) is int and type(exponent) is int and exponent > 0:
+            # |base| ** exponent has more than (bit_length(base) - 1) * exponent bits; anything
+            # this estimate lets through stays within twice the limit, for the final result check
+            if (base.bit_length() - 1) * exponent >= MAX_RESULT_BITS:
+                power = f"{_describe_int(base)} ** {_describe_int(exponent)}"
+                logger.error("Power rejected: %s exceeds %s bits", power, MAX_RESULT_BITS)
+                raise ValueError(f"Power too large: {power} would exceed {MAX_RESULT_BITS} bits")
+
+
+def _compile_expression(expression: str) -> CodeType:
+    """
+    Parses and validates an arithmetic expression, then compiles it to a constant-folded code object.
+
+    Args:
+        expression (str): Arithmetic expression like "(234 * 12) + 98".
+
+    Returns:
+        CodeType: Compiled expression, safe to evaluate without builtins.
+
+    Raises:
+        SyntaxError: If the expression cannot be parsed.
+        ValueError: If the expression contains anything but numbers and allowed operators,
+            or an integer power would exceed `MAX_RESULT_BITS`.
+    """
+    tree = ast.parse(expression, mode="eval")
+    _check_power_sizes(_validate_expr(tree.body))
+    # CPython's AST optimizer folds literal-only operations during compilation, so a
+    # validated expression usually compiles to a single constant load
+    return compile(tree, "<calc>", "eval", optimize=2)
+
+
+@lru_cache(maxsize=1024)
+def _evaluate_expression(expression: str) -> Union[int, float]:
+    """
+    Evaluates an arithmetic expression, caching the value per expression string.
+
+    Expressions contain only literals, so the value depends on nothing but the string;
+    repeated expressions skip parsing, validation, compilation, and evaluation entirely.
+
+    Args:
+        expression (str): Arithmetic expression like "(234 * 12) + 98".
+
+    Returns:
+        int | float: Computed numeric result.
+
+    Raises:
+        SyntaxError: If the expression cannot be parsed.
+        ValueError: If the expression contains anything but numbers and allowed operators,
+            or the result exceeds `MAX_RESULT_BITS`.
+        ArithmeticError: If evaluation fails (e.g., division by zero).
+    """
+    # The AST whitelist guarantees the code only does arithmetic on literals
+    result = eval(_compile_expression(expression), {"__builtins__": {}}, {})
+    # Raising here (rather than returning) keeps huge values out of the lru_cache
+    if type(result) is int and result.bit_length() > MAX_RESULT_BITS:
+        raise ValueError(f"Result too large (more than {MAX_RESULT_BITS} bits)")
+    return result
 
 
 @tool
 def math_calculator(expression: str) -> str:
     """
-    Safely evaluates a basic arithmetic expression using AST parsing (no eval).
+    Safely evaluates a basic arithmetic expression (numbers with + - * / **, unary minus, and parentheses only).
+    Integer results are limited to about 3000 digits.
 
     Args:
         expression (str): Arithmetic expression like "(234 * 12) + 98".
@@ -58,18 +227,50 @@ def math_calculator(expression: str) -> str:
     Returns:
         str: "Result: <value>" or error message if evaluation fails.
     """
-    logger.info(f"[TOOL CALL] math_calculator invoked with expression: {expression}")
+    logger.info("[TOOL CALL] math_calculator invoked with expression: %s", expression)
     try:
-        tree = ast.parse(expression, mode="eval")
-        result = _eval_expr(tree.body)
-        logger.info(f"[TOOL SUCCESS] Math calculation result: {result}")
+        _check_expression_size(expression)
+        result = _evaluate_expression(expression)
+        logger.info("[TOOL SUCCESS] Math calculation result: %s", result)
         return f"Result: {result}"
+    except (SyntaxError, ValueError, ArithmeticError) as e:
+        # Bad input from the caller: the message is enough, a traceback adds nothing
+        logger.error("[TOOL ERROR] Math calculation failed: %s", e)
+        return f"Error evaluating expression: {str(e)}"
     except Exception as e:
-        logger.error(f"[TOOL ERROR] Math calculation failed: {str(e)}", exc_info=True)
+        logger.error("[TOOL ERROR] Unexpected error in math_calculator: %s", e, exc_info=True)
         return f"Error evaluating expression: {str(e)}"
 
 
 # ==================== Text Analysis Tool ====================
+# Sentiment lexicons (lowercase)
+POSITIVE_WORDS = frozenset({"good", "great", "excellent", "happy", "love"})
+NEGATIVE_WORDS = frozenset({"bad", "poor", "sad", "hate", "terrible"})
+
+
+def _lexicon_alternation(words: frozenset) -> str:
+    """
+    Builds a regex alternation matching any of the given words literally.
+
+    Args:
+        words (frozenset): Lowercase words to match.
+
+    Returns:
+        str: Pattern fragment like "bad|hate|poor".
+    """
+    return "|".join(sorted(map(re.escape, words)))
+
+
+# One case-insensitive scan finds both lexicons; the named group of each match tells
+# which one it came from. Lookarounds restrict matches to whole whitespace-delimited tokens.
+_SENTIMENT_RE = re.compile(
+    rf"(?<!\S)(?:(?P<positive>{_lexicon_alternation(POSITIVE_WORDS)})"
+    rf"|(?P<negative>{_lexicon_alternation(NEGATIVE_WORDS)}))(?!\S)",
+    re.IGNORECASE,
+)
+_iter_sentiment_words = _SENTIMENT_RE.finditer
+
+
 @tool
 def analyze_text(text: str) -> dict:
     """
@@ -86,20 +287,16 @@ def analyze_text(text: str) -> dict:
         }
         On error, returns {"error": "<message>"}.
     """
-    logger.info(f"[TOOL CALL] analyze_text invoked with text length: {len(text)}")
-    logger.debug(f"Text preview: {text[:100]}...")
+    logger.info("[TOOL CALL] analyze_text invoked with text length: %s", len(text))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Text preview: %s...", text[:100])
 
     try:
-        words = text.split()
-        char_count = len(text)
-
-        positive_words = ["good", "great", "excellent", "happy", "love"]
-        negative_words = ["bad", "poor", "sad", "hate", "terrible"]
-
-        sentiment_score = sum(
-            1 if w.lower() in positive_words else -1 if w.lower() in negative_words else 0
-            for w in words
-        )
+        # Lexicon matching runs in a single regex pass; only matched words reach Python,
+        # where they are tallied per lexicon rather than scored one by one
+        word_count = len(text.split())
+        counts = Counter(match.lastgroup for match in _iter_sentiment_words(text))
+        sentiment_score = counts["positive"] - counts["negative"]
 
         sentiment = "Neutral"
         if sentiment_score > 0:
@@ -108,20 +305,38 @@ def analyze_text(text: str) -> dict:
             sentiment = "Negative"
 
         result = {
-            "word_count": len(words),
-            "character_count": char_count,
+            "word_count": word_count,
+            "character_count": len(text),
             "sentiment": sentiment
         }
 
-        logger.info(f"[TOOL SUCCESS] Text analysis complete: {result}")
+        logger.info("[TOOL SUCCESS] Text analysis complete: %s", result)
         return result
 
     except Exception as e:
-        logger.error(f"[TOOL ERROR] Text analysis failed: {str(e)}", exc_info=True)
+        logger.error("[TOOL ERROR] Text analysis failed: %s", e, exc_info=True)
         return {"error": str(e)}
 
 
 # ==================== Date Utility Tool ====================
+@lru_cache(maxsize=1024)
+def _iso_offset(today_ordinal: int, days: int) -> str:
+    """
+    Returns the ISO date `days` after the given day, cached per (day, offset) pair.
+
+    Args:
+        today_ordinal (int): Proleptic Gregorian ordinal of the base date (`date.toordinal()`).
+        days (int): Number of days to add.
+
+    Returns:
+        str: ISO date string "YYYY-MM-DD".
+
+    Raises:
+        ValueError: If the resulting date is outside the supported range.
+    """
+    return date.fromordinal(today_ordinal + days).isoformat()
+
+
 @tool("date_utility_tool")
 def date_utility_tool(days: int) -> str:
     """
@@ -133,7 +348,7 @@ def date_utility_tool(days: int) -> str:
     Returns:
         str: ISO date string "YYYY-MM-DD" or error message.
     """
-    logger.info(f"[TOOL CALL] date_utility_tool invoked with days: {days}")
+    logger.info("[TOOL CALL] date_utility_tool invoked with days: %s", days)
     
     try:
         if days is None:
@@ -141,55 +356,215 @@ def date_utility_tool(days: int) -> str:
         if not isinstance(days, int):
             raise TypeError("Days must be an integer.")
         
-        result_date = (date.today() + timedelta(days=days)).isoformat()
-        logger.info(f"[TOOL SUCCESS] Calculated date: {result_date}")
+        # Keyed on today's ordinal, so cached answers roll over at midnight
+        result_date = _iso_offset(date.today().toordinal(), days)
+        logger.info("[TOOL SUCCESS] Calculated date: %s", result_date)
         return result_date
 
-    except Exception as e:
-        logger.error(f"[TOOL ERROR] Date calculation failed: {str(e)}", exc_info=True)
+    except (ValueError, TypeError, OverflowError) as e:
+        logger.error("[TOOL ERROR] Date calculation failed: %s", e)
         return f"ERROR: {type(e).__name__}: {e}"
 
 
 # ==================== Weather Tool ====================
-@tool
-def get_weather(city: str) -> dict:
+# Shared session keeps connections to the weather API alive between calls,
+# so only the first request pays for the TCP + TLS handshake. Failed connections
+# are retried, but a read timeout is not: read=False re-raises it as ReadTimeout
+# straight away, so a stalled server costs one read timeout, not three
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, read=False, backoff_factor=0.2),
+    ),
+)
+
+# (connect, read) timeouts in seconds; connect is just above the 3s TCP retransmit window
+WEATHER_TIMEOUT = (3.05, 10)
+
+# Endpoint and per-process query parameters; only the city varies between requests
+WEATHER_API_URL = "https://api.openweathermap.org/data/2.5/weather"
+_WEATHER_STATIC_PARAMS = {"appid": weather_api_key, "units": "metric"}
+
+# Per-city cache of lookups: lowercased city -> (expiry time, result). Successful
+# results live for minutes; API rejections (e.g., unknown city) only briefly.
+# Guarded by a lock because tool calls (and get_weather_many) run on worker threads
+WEATHER_CACHE_TTL = 300
+WEATHER_ERROR_CACHE_TTL = 15
+WEATHER_CACHE_SIZE = 256
+_weather_cache: dict = {}
+_weather_cache_stats = {"hits": 0, "misses": 0}
+_weather_cache_lock = threading.Lock()
+
+# Most cities get_weather_many fetches per call (each one is a billed API request);
+# kept below the connection pool size so all of them can run at once
+WEATHER_MAX_CITIES = 10
+
+# City names may contain letters in any script (with combining marks, as in Devanagari)
+# plus the punctuation used in names like "St. John's" or "London,uk"
+MAX_CITY_LENGTH = 85
+_CITY_PUNCTUATION = str.maketrans("", "", " .,'-")
+
+
+def _is_valid_city(city: str) -> bool:
     """
-    Fetches live weather data for a city using OpenWeatherMap API.
+    Checks whether a stripped city name could be a real place name.
+
+    Args:
+        city (str): City name with surrounding whitespace removed.
+
+    Returns:
+        bool: True if the name is short enough, has at least one letter, and contains only
+        letters, combining marks, spaces, and . , ' - characters.
+    """
+    if len(city) > MAX_CITY_LENGTH:
+        return False
+    letters = city.translate(_CITY_PUNCTUATION)
+    return bool(letters) and all(
+        ch.isalpha() or unicodedata.category(ch).startswith("M") for ch in letters
+    )
+
+
+def _cache_weather(cache_key: str, result: dict, ttl: float) -> None:
+    """
+    Stores a weather result for `ttl` seconds, evicting the oldest entry when the cache is full.
+
+    Args:
+        cache_key (str): Normalized city name.
+        result (dict): Result returned by `get_weather`.
+        ttl (float): Seconds the entry stays valid.
+    """
+    with _weather_cache_lock:
+        _weather_cache.pop(cache_key, None)
+        if len(_weather_cache) >= WEATHER_CACHE_SIZE:
+            del _weather_cache[next(iter(_weather_cache))]
+        _weather_cache[cache_key] = (time.monotonic() + ttl, dict(result))
+
+
+def _fetch_weather(city: str) -> dict:
+    """
+    Returns weather for one city from the cache, or from OpenWeatherMap on a miss.
 
     Args:
         city (str): City name (e.g., "Chandigarh").
 
     Returns:
-        dict: {
-            "temperature": float (°C),
-            "condition": str (description)
-        }
-        On failure: {"error": "<message>"}.
+        dict: {"temperature": float (°C), "condition": str} or {"error": "<message>"}.
     """
-    logger.info(f"[TOOL CALL] get_weather invoked for city: {city}")
+    # Reject inputs the API can only answer with a 404, without a network round trip
+    city = city.strip()
+    if not _is_valid_city(city):
+        logger.error("[TOOL ERROR] Invalid city name: %r", city)
+        return {"error": "Invalid city name"}
+
+    cache_key = city.lower()
+    with _weather_cache_lock:
+        cached = _weather_cache.get(cache_key)
+        hit = cached is not None and time.monotonic() < cached[0]
+        _weather_cache_stats["hits" if hit else "misses"] += 1
+    if hit:
+        logger.debug("Weather cache hit for %s (stats: %s)", cache_key, _weather_cache_stats)
+        return dict(cached[1])
+    logger.debug("Weather cache miss for %s (stats: %s)", cache_key, _weather_cache_stats)
 
     try:
-        url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={weather_api_key}&units=metric"
-        logger.debug(f"Making API request to OpenWeatherMap: {url}")
+        logger.debug("Making API request to OpenWeatherMap for city: %s", city)
 
-        response = requests.get(url, timeout=10)
+        # params= URL-encodes the city (spaces, &, #) and keeps the API key out of the logs
+        response = SESSION.get(
+            WEATHER_API_URL,
+            params={**_WEATHER_STATIC_PARAMS, "q": city},
+            timeout=WEATHER_TIMEOUT,
+        )
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content) if orjson is not None else response.json()
 
         result = {
             "temperature": data["main"]["temp"],
             "condition": data["weather"][0]["description"]
         }
 
-        logger.info(f"[TOOL SUCCESS] Weather data retrieved: {result}")
+        _cache_weather(cache_key, result, WEATHER_CACHE_TTL)
+
+        logger.info("[TOOL SUCCESS] Weather data retrieved: %s", result)
         return result
 
     except requests.exceptions.Timeout:
-        logger.error(f"[TOOL ERROR] Weather API request timed out for city: {city}")
+        logger.error("[TOOL ERROR] Weather API request timed out for city: %s", city)
         return {"error": "Request timed out"}
+    except requests.exceptions.HTTPError as e:
+        # The API rejected the request (e.g., unknown city); remember briefly to avoid re-asking.
+        # str(e) would include the request URL, and with it the API key
+        logger.error("[TOOL ERROR] Weather API returned HTTP %s for city: %s", e.response.status_code, city)
+        result = {"error": f"Weather API returned HTTP {e.response.status_code}"}
+        _cache_weather(cache_key, result, WEATHER_ERROR_CACHE_TTL)
+        return result
     except requests.exceptions.RequestException as e:
-        logger.error(f"[TOOL ERROR] Weather API request failed: {str(e)}", exc_info=True)
-        return {"error": str(e)}
+        # Connection errors embed the request URL (and the API key) in their message,
+        # so neither the log nor the result repeats it
+        logger.error("[TOOL ERROR] Weather API request failed for city %s: %s", city, type(e).__name__)
+        return {"error": f"Weather API request failed ({type(e).__name__})"}
     except Exception as e:
-        logger.error(f"[TOOL ERROR] Unexpected error in get_weather: {str(e)}", exc_info=True)
+        logger.error("[TOOL ERROR] Unexpected error in get_weather: %s", e, exc_info=True)
         return {"error": str(e)}
+
+
+@tool
+def get_weather(city: str) -> dict:
+    """
+    Fetches live weather data for a city using OpenWeatherMap API.
+
+    Args:
+        city (str): City name (e.g., "Chandigarh").
+
+    Returns:
+        dict: {
+            "temperature": float (°C),
+            "condition": str (description)
+        }
+        On failure: {"error": "<message>"}.
+    """
+    logger.info("[TOOL CALL] get_weather invoked for city: %s", city)
+    return _fetch_weather(city)
+
+
+@tool
+def get_weather_many(cities: List[str]) -> dict:
+    """
+    Fetches live weather data for several cities (at most 10) at once using OpenWeatherMap API.
+    Prefer this over repeated get_weather calls when comparing cities.
+
+    Args:
+        cities (list[str]): City names (e.g., ["Chandigarh", "Delhi"]).
+
+    Returns:
+        dict: {
+            "<city>": {"temperature": float (°C), "condition": str (description)}
+                      or {"error": "<message>"}
+        }
+    """
+    logger.info("[TOOL CALL] get_weather_many invoked for %d cities: %s", len(cities), cities)
+
+    # Deduplicate on the cache key, keeping the first spelling of each city
+    unique_cities: dict = {}
+    for city in cities:
+        unique_cities.setdefault(city.strip().lower(), city.strip())
+    names = list(unique_cities.values())
+    if not names:
+        return {}
+
+    to_fetch, excess = names[:WEATHER_MAX_CITIES], names[WEATHER_MAX_CITIES:]
+    if excess:
+        logger.error("[TOOL ERROR] Too many cities requested, skipping: %s", excess)
+
+    # Requests overlap on the shared session's connection pool, so total latency is
+    # roughly that of the slowest city rather than the sum over all cities
+    with ThreadPoolExecutor(max_workers=len(to_fetch)) as executor:
+        results = dict(zip(to_fetch, executor.map(_fetch_weather, to_fetch)))
+    for city in excess:
+        results[city] = {"error": f"Too many cities requested (max {WEATHER_MAX_CITIES} per call)"}
+
+    logger.info("[TOOL SUCCESS] Weather data retrieved for %d cities", len(to_fetch))
+    return results